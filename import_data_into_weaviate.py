@@ -4,25 +4,58 @@ import numpy as np
 import re
 import os
 import json
-from time import sleep
-from openai import OpenAI
+import hashlib
+import random
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from time import sleep, monotonic
+from openai import OpenAI, RateLimitError, APIConnectionError, APITimeoutError
 import weaviate
+from weaviate.util import generate_uuid5
 from tqdm import tqdm
 
-client = OpenAI()
+# Enrichment concurrency and rate limits
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 150000
+ESTIMATED_COMPLETION_TOKENS = 800
+MAX_RETRIES = 5
+IN_FLIGHT_PER_WORKER = 2
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# Weaviate batch import settings
+SERVICE_CLASS_NAME = "ServiceDescription"
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_WORKERS = 4
+
+# Client-side embedding settings
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 512
+EMBEDDING_BATCH_MAX_TOKENS = 250000
+EMBEDDING_MAX_INPUT_TOKENS = 8000
+# Lithuanian text tokenizes denser than English, so budget embeddings pessimistically
+EMBEDDING_CHARS_PER_TOKEN = 2
+DEFAULT_VECTOR_CACHE_PATH = "vector_cache.sqlite3"
 
 # Weaviate client setup
-wcd_api_key = os.environ.get("WCS_API_KEY")
 wcd_url = 'https://doryjgsbqxaoy4efqu6iwq.c0.europe-west3.gcp.weaviate.cloud'
 
-weaviate_client = weaviate.Client(
-    url=wcd_url,
-    auth_client_secret=weaviate.AuthApiKey(api_key=wcd_api_key)
-)
 
-# Add a warning about OpenAI library version
-st.warning(
-    "This script requires OpenAI library version 0.28. If you encounter errors, please run: pip install openai==0.28")
+@lru_cache(maxsize=None)
+def get_openai_client():
+    # Our own backoff loops retry every call, so SDK retries would bypass the rate limiter and multiply attempts
+    return OpenAI(max_retries=0)
+
+
+@lru_cache(maxsize=None)
+def get_weaviate_client():
+    return weaviate.Client(
+        url=wcd_url,
+        auth_client_secret=weaviate.AuthApiKey(api_key=os.environ.get("WCS_API_KEY"))
+    )
 
 
 @st.cache_data
@@ -46,8 +79,8 @@ def is_url(text):
     return bool(url_pattern.search(text))
 
 
-def enrich_description_with_gpt(row):
-    prompt = f"""
+def build_enrichment_prompt(row):
+    return f"""
     Given the following information about a Lithuanian public service provider, please specify and enrich which services the provider is offering:
 
     Service Name: {row['COMBINED_NAME']}
@@ -59,78 +92,221 @@ def enrich_description_with_gpt(row):
     Please provide a detailed description of the services offered, expanding on the current description and incorporating relevant information from the categories, life events, and keywords. Return results translated into Lithuanian language.
     """
 
-    st.text("Prompt for GPT enrichment:")
-    st.code(prompt, language="text")
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-1106-preview",
-            messages=[
-                {"role": "system",
-                 "content": "You are a helpful assistant that specializes in describing Lithuanian public services."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        enriched_description = response.choices[0].message.content
-        return f"{row['DESCRIPTION']} {enriched_description}"
-    except Exception as e:
-        st.error(f"Error in GPT enrichment: {str(e)}")
-        return row['DESCRIPTION']
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `capacity` units per minute."""
 
+    def __init__(self, capacity_per_minute):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated_at = monotonic()
+        self.lock = threading.Lock()
 
-def enrich_and_save(df, start_index=0, output_dir="enriched_services"):
-    os.makedirs(output_dir, exist_ok=True)
+    def _refill(self):
+        now = monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
 
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    def acquire(self, amount=1):
+        # Requests larger than the bucket would never fit, so clamp them to a full bucket
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                delay = (amount - self.available) / self.rate
+            sleep(delay)
 
-    for index, row in tqdm(df.iloc[start_index:].iterrows(), total=len(df) - start_index):
-        try:
-            # Enrich the description
-            enriched_description = enrich_description_with_gpt(row)
-
-            # Prepare the data object
-            data_object = {
-                "iD": str(row["ID"]),
-                "LONG_NAME": row["LONG_NAME"],
-                "SHORT_NAME": row["SHORT_NAME"],
-                "DESCRIPTION": row["DESCRIPTION"],
-                "SHORT_DESCRIPTION": row["SHORT_DESCRIPTION"],
-                "KEYWORDS": row["KEYWORDS"],
-                "CATEGORIES": row["CATEGORIES"],
-                "LIFE_EVENTS": row["LIFE_EVENTS"],
-                "PROVIDER_NAMES": row["PROVIDER_NAMES"],
-                "POPULARITY": int(row["POPULARITY"]),
-                "COMBINED_NAME": row["COMBINED_NAME"],
-                "ENRICHED_DESCRIPTION": enriched_description
-            }
-
-            # Save to file
-            file_path = os.path.join(output_dir, f"{row['ID']}.json")
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data_object, f, ensure_ascii=False, indent=4)
-
-            st.write(f"Saved enriched data for ID {row['ID']}")
 
+class RateLimiter:
+    """Combined requests-per-minute and tokens-per-minute limiter shared by enrichment workers."""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def acquire(self, estimated_tokens):
+        self.requests.acquire(1)
+        self.tokens.acquire(estimated_tokens)
+
+
+def estimate_text_tokens(text, chars_per_token=4):
+    return len(text) // chars_per_token + 1
+
+
+def estimate_tokens(prompt):
+    # Roughly four characters per token, plus headroom for the completion
+    return estimate_text_tokens(prompt) + ESTIMATED_COMPLETION_TOKENS
+
+
+def backoff_delay(attempt):
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt) * (1 + random.random())
+
+
+def is_retryable_error(error):
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+def enrich_description_with_gpt(row, chat_client=None, limiter=None, max_retries=MAX_RETRIES):
+    """
+    Request an enriched description for one row.
+
+    Safe to call from worker threads: it does not touch Streamlit. Rate-limit,
+    connection and 5xx errors are retried with exponential backoff; any other
+    error, or exhausting the retries, is raised to the caller.
+    Pass an OpenAI client with a custom `base_url` to run against a local fake endpoint.
+    """
+    chat_client = chat_client or get_openai_client()
+    prompt = build_enrichment_prompt(row)
+    estimated_tokens = estimate_tokens(prompt)
+
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire(estimated_tokens)
+        try:
+            response = chat_client.chat.completions.create(
+                model="gpt-4-1106-preview",
+                messages=[
+                    {"role": "system",
+                     "content": "You are a helpful assistant that specializes in describing Lithuanian public services."},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+            enriched_description = response.choices[0].message.content
+            return f"{row['DESCRIPTION']} {enriched_description}"
         except Exception as e:
-            st.error(f"Error processing row {index} (ID: {row['ID']}): {str(e)}")
-            continue
+            if attempt == max_retries or not is_retryable_error(e):
+                raise
+            sleep(backoff_delay(attempt))
+
+
+def build_data_object(row, enriched_description):
+    return {
+        "iD": str(row["ID"]),
+        "LONG_NAME": row["LONG_NAME"],
+        "SHORT_NAME": row["SHORT_NAME"],
+        "DESCRIPTION": row["DESCRIPTION"],
+        "SHORT_DESCRIPTION": row["SHORT_DESCRIPTION"],
+        "KEYWORDS": row["KEYWORDS"],
+        "CATEGORIES": row["CATEGORIES"],
+        "LIFE_EVENTS": row["LIFE_EVENTS"],
+        "PROVIDER_NAMES": row["PROVIDER_NAMES"],
+        "POPULARITY": int(row["POPULARITY"]),
+        "COMBINED_NAME": row["COMBINED_NAME"],
+        "ENRICHED_DESCRIPTION": enriched_description
+    }
 
-        # Update progress
-        progress = (index - start_index + 1) / (len(df) - start_index)
-        progress_bar.progress(progress)
-        status_text.text(f"Processed {index - start_index + 1} out of {len(df) - start_index} rows")
 
-        # Save progress every 10 rows
-        if (index - start_index + 1) % 10 == 0:
-            st.session_state.last_processed_index = index
+def enriched_file_path(output_dir, service_id):
+    return os.path.join(output_dir, f"{service_id}.json")
 
+
+def enrich_and_write_row(row, output_dir, chat_client=None, limiter=None):
+    enriched_description = enrich_description_with_gpt(row, chat_client=chat_client, limiter=limiter)
+    data_object = build_data_object(row, enriched_description)
+
+    # The file's existence marks the row as done, so never leave a partially written one behind
+    file_path = enriched_file_path(output_dir, row['ID'])
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data_object, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, file_path)
+    return data_object
+
+
+def enrich_and_save(df, start_index=0, output_dir="enriched_services", max_workers=DEFAULT_MAX_WORKERS,
+                    requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                    chat_client=None):
+    os.makedirs(output_dir, exist_ok=True)
+    if chat_client is not None:
+        chat_client = chat_client.with_options(max_retries=0)
+
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+
+    rows = df.iloc[start_index:]
+    total = len(rows)
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+    # Results arrive out of order; the resume index only advances past a contiguous run of settled rows.
+    # A row is settled once its JSON exists or it has failed permanently, so failures never pin the index.
+    settled_positions = set()
+    next_unsettled = 0
+    failed_ids = []
+
+    def report_progress():
+        nonlocal next_unsettled
+        if total:
+            progress_bar.progress(completed / total)
+        status_text.text(f"Processed {completed} out of {total} rows")
+
+        while next_unsettled in settled_positions:
+            settled_positions.discard(next_unsettled)
+            next_unsettled += 1
+        st.session_state.last_processed_index = start_index + next_unsettled
+
+    work = []
+    for position, (index, row) in enumerate(rows.iterrows()):
+        if os.path.exists(enriched_file_path(output_dir, row['ID'])):
+            settled_positions.add(position)
+        else:
+            work.append((position, index, row))
+    completed = len(settled_positions)
+    if completed:
+        st.write(f"Skipping {completed} rows already saved in {output_dir}")
+    report_progress()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    work_iter = iter(work)
+    in_flight = {}
+    try:
+        with tqdm(total=total, initial=completed) as pbar:
+            while True:
+                # Only keep a few rows queued per worker, so a Stop or rerun leaves little work behind
+                while len(in_flight) < max_workers * IN_FLIGHT_PER_WORKER:
+                    item = next(work_iter, None)
+                    if item is None:
+                        break
+                    position, index, row = item
+                    future = executor.submit(enrich_and_write_row, row, output_dir, chat_client, limiter)
+                    in_flight[future] = (position, index, row["ID"])
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position, index, row_id = in_flight.pop(future)
+                    try:
+                        future.result()
+                        st.write(f"Saved enriched data for ID {row_id}")
+                    except Exception as e:
+                        failed_ids.append(row_id)
+                        st.error(f"Error processing row {index} (ID: {row_id}): {str(e)}")
+                    settled_positions.add(position)
+                    completed += 1
+                    pbar.update(1)
+
+                report_progress()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        st.session_state.failed_ids = failed_ids
+
+    if failed_ids:
+        st.warning(f"{len(failed_ids)} rows failed and were not saved. Use 'Retry Failed Rows' to send them again; "
+                   f"rows that are already saved are skipped.")
     status_text.text("Enrichment and saving completed!")
 
 
-def create_weaviate_schema():
+def create_weaviate_schema(db_client=None):
+    db_client = db_client or get_weaviate_client()
     schema = {
-        "class": "ServiceDescription",
+        "class": SERVICE_CLASS_NAME,
         "vectorizer": "none",
         "properties": [
             {"name": "iD", "dataType": ["string"]},
@@ -147,46 +323,272 @@ def create_weaviate_schema():
             {"name": "ENRICHED_DESCRIPTION", "dataType": ["text"]}
         ]
     }
-    weaviate_client.schema.create_class(schema)
+    db_client.schema.create_class(schema)
+
+
+def service_uuid(service_id):
+    # Deterministic per iD, so re-importing the same record overwrites it instead of duplicating
+    return generate_uuid5(str(service_id), SERVICE_CLASS_NAME)
+
+
+def collect_batch_errors(results, errors):
+    """Append (uuid, message) for every failed object in a batch response."""
+    for result in results or []:
+        result_errors = (result.get("result") or {}).get("errors")
+        if result_errors:
+            messages = "; ".join(error.get("message", str(error)) for error in result_errors.get("error", []))
+            errors.append((result.get("id"), messages or str(result_errors)))
+
 
+def embedding_text(data_object):
+    return f"{data_object.get('COMBINED_NAME', '')}\n{data_object.get('ENRICHED_DESCRIPTION', '')}".strip()
 
-def upload_to_weaviate(input_dir="enriched_services"):
-    if not weaviate_client.schema.exists("ServiceDescription"):
-        create_weaviate_schema()
+
+class OpenAIEmbedder:
+    """Embedding backend calling the OpenAI embeddings endpoint."""
+
+    def __init__(self, model=DEFAULT_EMBEDDING_MODEL, embedding_client=None):
+        self.model = model
+        self.name = f"openai:{model}"
+        if embedding_client is not None:
+            embedding_client = embedding_client.with_options(max_retries=0)
+        self.embedding_client = embedding_client or get_openai_client()
+
+    def embed(self, texts):
+        response = self.embedding_client.embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class HashingEmbedder:
+    """Deterministic local embedding backend (hashed bag of words), for tests and offline runs."""
+
+    def __init__(self, dimensions=256):
+        self.dimensions = dimensions
+        self.name = f"hashing:{dimensions}"
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                digest = hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], 'little') % self.dimensions
+                vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+        return vectors.tolist()
+
+
+class VectorCache:
+    """Persistent SQLite cache of embeddings keyed by a hash of the embedder name and input text."""
+
+    def __init__(self, path=DEFAULT_VECTOR_CACHE_PATH):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    @staticmethod
+    def key(embedder_name, text):
+        return hashlib.sha256(f"{embedder_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.connection.execute(f"SELECT key, vector FROM vectors WHERE key IN ({placeholders})", chunk)
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, items):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO vectors (key, vector) VALUES (?, ?)",
+            [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+def prepare_embedding_text(data_object):
+    # Truncate so a single input stays under the embeddings endpoint's per-input token limit
+    max_chars = EMBEDDING_MAX_INPUT_TOKENS * EMBEDDING_CHARS_PER_TOKEN
+    return embedding_text(data_object)[:max_chars]
+
+
+def embed_with_retries(embedder, texts, max_retries=MAX_RETRIES):
+    for attempt in range(max_retries + 1):
+        try:
+            return embedder.embed(texts)
+        except Exception as e:
+            if attempt == max_retries or not is_retryable_error(e):
+                raise
+            sleep(backoff_delay(attempt))
+
+
+def token_budget_batches(items, max_items, max_tokens):
+    """Split (key, text) pairs into batches bounded by item count and estimated tokens."""
+    batch, batch_tokens = [], 0
+    for key, text in items:
+        tokens = estimate_text_tokens(text, EMBEDDING_CHARS_PER_TOKEN)
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append((key, text))
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def embed_objects(data_objects, embedder, vector_cache, batch_size=EMBEDDING_BATCH_SIZE,
+                  max_batch_tokens=EMBEDDING_BATCH_MAX_TOKENS):
+    """
+    Return (vectors, embedded_count, errors), embedding only texts missing from the cache.
+
+    `vectors` has one entry per data object and `embedded_count` counts objects (not
+    unique texts) that needed a fresh embedding. Objects with no text, or whose batch
+    failed after retries, get None and an (iD, message) entry in `errors`.
+    """
+    texts = [prepare_embedding_text(data_object) for data_object in data_objects]
+    keys = [VectorCache.key(embedder.name, text) if text else None for text in texts]
+    vectors = vector_cache.get_many(list({key for key in keys if key}))
+    cached_keys = set(vectors)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key and key not in vectors:
+            missing.setdefault(key, text)
+
+    batch_failures = {}
+    for chunk in token_budget_batches(missing.items(), batch_size, max_batch_tokens):
+        try:
+            embedded = embed_with_retries(embedder, [text for _, text in chunk])
+        except Exception as e:
+            batch_failures.update((key, str(e)) for key, _ in chunk)
+            continue
+        new_vectors = list(zip([key for key, _ in chunk], embedded))
+        vector_cache.put_many(new_vectors)
+        vectors.update(new_vectors)
+
+    results, errors = [], []
+    for data_object, key in zip(data_objects, keys):
+        if key in vectors:
+            results.append(vectors[key])
+            continue
+        results.append(None)
+        message = batch_failures.get(key, "embedding failed") if key else "no text to embed"
+        errors.append((data_object.get("iD"), message))
+    embedded_count = sum(1 for key in keys if key in vectors and key not in cached_keys)
+    return results, embedded_count, errors
+
+
+def upload_to_weaviate(input_dir="enriched_services", batch_size=DEFAULT_BATCH_SIZE,
+                       num_workers=DEFAULT_BATCH_WORKERS, db_client=None, embedder=None, vector_cache=None):
+    db_client = db_client or get_weaviate_client()
+    if not db_client.schema.exists(SERVICE_CLASS_NAME):
+        create_weaviate_schema(db_client)
 
     progress_bar = st.progress(0)
     status_text = st.empty()
 
-    file_list = os.listdir(input_dir)
-    for i, filename in enumerate(file_list):
-        if filename.endswith('.json'):
-            file_path = os.path.join(input_dir, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data_object = json.load(f)
-
-                # Upload to Weaviate
-                weaviate_client.data_object.create(
-                    class_name="ServiceDescription",
-                    data_object=data_object
-                )
-                st.write(f"Uploaded record for ID {data_object['iD']}")
-
-            except Exception as e:
-                st.error(f"Error uploading file {filename}: {str(e)}")
-                continue
-
-        # Update progress
-        progress = (i + 1) / len(file_list)
-        progress_bar.progress(progress)
-        status_text.text(f"Processed {i + 1} out of {len(file_list)} files")
+    with os.scandir(input_dir) as entries:
+        file_list = sorted(entry.name for entry in entries if entry.is_file() and entry.name.endswith('.json'))
+    if not file_list:
+        status_text.text(f"No enriched files found in {input_dir}")
+        return 0, []
+
+    data_objects = []
+    for filename in file_list:
+        file_path = os.path.join(input_dir, filename)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data_objects.append(json.load(f))
+        except Exception as e:
+            st.error(f"Error reading file {filename}: {str(e)}")
 
+    status_text.text(f"Embedding {len(data_objects)} objects...")
+    embedder = embedder or OpenAIEmbedder()
+    owns_cache = vector_cache is None
+    vector_cache = vector_cache or VectorCache()
+    try:
+        vectors, embedded_count, embedding_errors = embed_objects(data_objects, embedder, vector_cache)
+    finally:
+        if owns_cache:
+            vector_cache.close()
+    cached_count = len(data_objects) - embedded_count - len(embedding_errors)
+    st.write(f"Embedded {embedded_count} new texts, {cached_count} served from cache")
+    # Without a vector the upsert would wipe any vector stored by an earlier run, so skip these objects
+    for service_id, message in embedding_errors:
+        st.error(f"Skipping object {service_id}, embedding failed: {message}")
+
+    # The callback may run on batch worker threads, so it only records results; Streamlit output stays here
+    batch_errors = []
+    confirmed_uuids = set()
+
+    def on_batch_results(results):
+        collect_batch_errors(results, batch_errors)
+        confirmed_uuids.update(result.get("id") for result in results or []
+                               if not (result.get("result") or {}).get("errors"))
+
+    db_client.batch.configure(
+        batch_size=batch_size,
+        dynamic=True,
+        num_workers=num_workers,
+        callback=on_batch_results
+    )
+
+    # Objects are queued before any auto-flush runs, so a batch-level exception may lose
+    # objects queued earlier; anything the callback never confirms is counted as failed
+    queued_uuids = []
+    batch_failures = []
+    started_at = monotonic()
+    try:
+        with db_client.batch as batch:
+            for i, (data_object, vector) in enumerate(zip(data_objects, vectors)):
+                if vector is not None:
+                    object_uuid = service_uuid(data_object["iD"])
+                    queued_uuids.append(object_uuid)
+                    try:
+                        batch.add_data_object(
+                            data_object=data_object,
+                            class_name=SERVICE_CLASS_NAME,
+                            uuid=object_uuid,
+                            vector=vector
+                        )
+                    except Exception as e:
+                        batch_failures.append(str(e))
+
+                # Update progress
+                progress_bar.progress((i + 1) / len(data_objects))
+                status_text.text(f"Queued {i + 1} out of {len(data_objects)} objects")
+            status_text.text("Flushing remaining objects...")
+    except Exception as e:
+        batch_failures.append(str(e))
+    elapsed = monotonic() - started_at
+
+    reported = {object_uuid for object_uuid, _ in batch_errors}
+    failure_message = "; ".join(dict.fromkeys(batch_failures)) or "not confirmed by Weaviate"
+    for object_uuid in dict.fromkeys(queued_uuids):
+        if object_uuid not in confirmed_uuids and object_uuid not in reported:
+            batch_errors.append((object_uuid, failure_message))
+
+    for object_uuid, message in batch_errors:
+        st.error(f"Error uploading object {object_uuid}: {message}")
+
+    uploaded = len(confirmed_uuids.intersection(queued_uuids))
+    throughput = uploaded / elapsed if elapsed > 0 else 0.0
     status_text.text("Upload to Weaviate completed!")
+    st.info(f"Uploaded {uploaded} of {len(file_list)} objects in {elapsed:.1f}s ({throughput:.1f} objects/sec)")
+    return uploaded, batch_errors
 
 
 def main():
     st.title("Service Description Data Enrichment and Weaviate Upload")
 
+    # Add a warning about OpenAI library version
+    st.warning(
+        "This script requires OpenAI library version 0.28. If you encounter errors, please run: pip install openai==0.28")
+
     file_path = "CC_QUICKSTART_CORTEX_DOCS_DATA_SERVICES.csv"
     if not os.path.exists(file_path):
         st.error(f"File not found: {file_path}")
@@ -204,9 +606,23 @@ def main():
     if 'last_processed_index' not in st.session_state:
         st.session_state.last_processed_index = 0
 
+    # Enrichment concurrency settings
+    with st.expander("Enrichment settings"):
+        max_workers = st.number_input("Parallel workers", min_value=1, max_value=64, value=DEFAULT_MAX_WORKERS)
+        requests_per_minute = st.number_input("Requests per minute", min_value=1,
+                                              value=DEFAULT_REQUESTS_PER_MINUTE)
+        tokens_per_minute = st.number_input("Tokens per minute", min_value=1000, value=DEFAULT_TOKENS_PER_MINUTE)
+
     # Enrich and save data
     if st.button("Start/Resume Enrichment and Saving"):
-        enrich_and_save(df_manipulated, st.session_state.last_processed_index)
+        enrich_and_save(df_manipulated, st.session_state.last_processed_index, max_workers=int(max_workers),
+                        requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute)
+
+    # Failed rows have no JSON file, so a pass from the start only re-sends those
+    if st.session_state.get('failed_ids') and st.button("Retry Failed Rows"):
+        st.session_state.last_processed_index = 0
+        enrich_and_save(df_manipulated, 0, max_workers=int(max_workers),
+                        requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute)
 
     # Upload to Weaviate
     if st.button("Upload Enriched Data to Weaviate"):
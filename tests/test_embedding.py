@@ -0,0 +1,204 @@
+import pytest
+
+import import_data_into_weaviate as importer
+from test_weaviate_upload import FakeWeaviateClient, write_services
+
+
+class CountingEmbedder(importer.HashingEmbedder):
+    def __init__(self, dimensions=16, failures=()):
+        super().__init__(dimensions)
+        self.failures = list(failures)
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        if self.failures:
+            raise self.failures.pop(0)
+        return super().embed(texts)
+
+
+class ServiceUnavailable(Exception):
+    status_code = 503
+
+
+def service(service_id, description="Description"):
+    return {"iD": service_id, "COMBINED_NAME": f"Service {service_id}", "ENRICHED_DESCRIPTION": description}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    vector_cache = importer.VectorCache(str(tmp_path / "cache.sqlite3"))
+    yield vector_cache
+    vector_cache.close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(importer, "sleep", lambda seconds: None)
+
+
+def test_hashing_embedder_is_deterministic():
+    embedder = importer.HashingEmbedder(dimensions=16)
+    first, second = embedder.embed(["Vilniaus paslaugos"]), embedder.embed(["Vilniaus paslaugos"])
+    assert first == second
+    assert len(first[0]) == 16
+
+
+def test_second_run_is_served_from_cache(cache):
+    embedder = CountingEmbedder()
+    objects = [service("1"), service("2"), service("3")]
+
+    vectors, embedded_count, errors = importer.embed_objects(objects, embedder, cache)
+    assert (embedded_count, errors) == (3, [])
+
+    cached_vectors, embedded_count, errors = importer.embed_objects(objects, embedder, cache)
+    assert (embedded_count, errors) == (0, [])
+    assert len(embedder.calls) == 1
+    assert cached_vectors == vectors
+
+
+def test_cache_persists_across_connections(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    objects = [service("1")]
+
+    first_cache = importer.VectorCache(path)
+    importer.embed_objects(objects, CountingEmbedder(), first_cache)
+    first_cache.close()
+
+    embedder = CountingEmbedder()
+    second_cache = importer.VectorCache(path)
+    _, embedded_count, _ = importer.embed_objects(objects, embedder, second_cache)
+    second_cache.close()
+    assert embedded_count == 0
+    assert embedder.calls == []
+
+
+def test_changed_description_is_embedded_again(cache):
+    embedder = CountingEmbedder()
+    importer.embed_objects([service("1"), service("2")], embedder, cache)
+
+    _, embedded_count, _ = importer.embed_objects([service("1"), service("2", "Updated description")],
+                                                  embedder, cache)
+    assert embedded_count == 1
+    assert embedder.calls[-1] == ["Service 2\nUpdated description"]
+
+
+def test_duplicate_texts_are_counted_per_object(cache):
+    embedder = CountingEmbedder()
+    objects = [service("1"), service("1"), service("2")]
+
+    vectors, embedded_count, errors = importer.embed_objects(objects, embedder, cache)
+    assert (embedded_count, errors) == (3, [])
+    assert len(embedder.calls[0]) == 2
+    assert vectors[0] == vectors[1]
+
+    _, embedded_count, _ = importer.embed_objects(objects + [service("3")], embedder, cache)
+    assert embedded_count == 1
+
+
+def test_injected_openai_client_disables_sdk_retries():
+    class FakeEmbeddingClient:
+        def __init__(self):
+            self.options = {}
+            self.requests = []
+
+        def with_options(self, **options):
+            self.options = options
+            return self
+
+        @property
+        def embeddings(self):
+            return self
+
+        def create(self, model, input):
+            self.requests.append(input)
+            data = [type("Item", (), {"index": i, "embedding": [float(i)]})() for i in range(len(input))]
+            return type("Response", (), {"data": list(reversed(data))})()
+
+    embedding_client = FakeEmbeddingClient()
+    embedder = importer.OpenAIEmbedder(embedding_client=embedding_client)
+
+    assert embedder.embed(["a", "b"]) == [[0.0], [1.0]]
+    assert embedding_client.options == {"max_retries": 0}
+
+
+def test_empty_text_is_reported_not_sent(cache):
+    embedder = CountingEmbedder()
+    vectors, embedded_count, errors = importer.embed_objects([service("1"), {"iD": "2"}], embedder, cache)
+
+    assert embedded_count == 1
+    assert vectors[1] is None
+    assert errors == [("2", "no text to embed")]
+    assert embedder.calls == [["Service 1\nDescription"]]
+
+
+def test_oversized_text_is_truncated():
+    text = importer.prepare_embedding_text(service("1", "x" * 100000))
+    assert len(text) == importer.EMBEDDING_MAX_INPUT_TOKENS * importer.EMBEDDING_CHARS_PER_TOKEN
+
+
+def test_batches_respect_token_budget():
+    items = [(str(i), "x" * 40) for i in range(10)]
+    batches = list(importer.token_budget_batches(items, max_items=4, max_tokens=63))
+
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+
+
+def test_transient_errors_are_retried(cache):
+    embedder = CountingEmbedder(failures=[ServiceUnavailable("unavailable")])
+    vectors, embedded_count, errors = importer.embed_objects([service("1")], embedder, cache)
+
+    assert (embedded_count, errors) == (1, [])
+    assert vectors[0] is not None
+    assert len(embedder.calls) == 2
+
+
+def test_failed_batch_does_not_abort_others(cache):
+    embedder = CountingEmbedder(failures=[ValueError("bad request")])
+    vectors, embedded_count, errors = importer.embed_objects([service("1"), service("2")], embedder, cache,
+                                                             batch_size=1)
+
+    assert embedded_count == 1
+    assert vectors[0] is None and vectors[1] is not None
+    assert errors == [("1", "bad request")]
+
+
+def test_vectors_are_attached_during_import(tmp_path):
+    services_dir = tmp_path / "enriched_services"
+    services_dir.mkdir()
+    write_services(services_dir, ["1", "2"])
+    db_client = FakeWeaviateClient()
+    embedder = importer.HashingEmbedder(dimensions=16)
+
+    uploaded, _ = importer.upload_to_weaviate(str(services_dir), db_client=db_client, embedder=embedder,
+                                              vector_cache=importer.VectorCache(str(tmp_path / "cache.sqlite3")))
+
+    assert uploaded == 2
+    for queued in db_client.batch.objects:
+        expected = embedder.embed([importer.embedding_text(queued["data_object"])])[0]
+        assert queued["vector"] == expected
+
+
+def test_objects_without_vectors_are_not_uploaded(tmp_path):
+    services_dir = tmp_path / "enriched_services"
+    services_dir.mkdir()
+    write_services(services_dir, ["1", "2"])
+    db_client = FakeWeaviateClient()
+    embedder = CountingEmbedder(failures=[ValueError("bad request")])
+
+    uploaded, _ = importer.upload_to_weaviate(str(services_dir), db_client=db_client, embedder=embedder,
+                                              vector_cache=importer.VectorCache(str(tmp_path / "cache.sqlite3")))
+
+    assert uploaded == 0
+    assert db_client.batch.objects == []
+
+
+def test_defaults_are_not_built_without_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(importer, "OpenAIEmbedder", lambda: pytest.fail("default embedder built"))
+    empty_dir = tmp_path / "empty"
+    empty_dir.mkdir()
+
+    result = importer.upload_to_weaviate(str(empty_dir), db_client=FakeWeaviateClient())
+    assert result == (0, [])
+    assert not (tmp_path / importer.DEFAULT_VECTOR_CACHE_PATH).exists()
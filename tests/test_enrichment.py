@@ -0,0 +1,204 @@
+import json
+import os
+import re
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+import import_data_into_weaviate as importer
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeChatClient:
+    """Stand-in for the OpenAI client: answers per service, optionally failing or blocking first."""
+
+    def __init__(self, failures=None, before_reply=None):
+        self.failures = {key: list(errors) for key, errors in (failures or {}).items()}
+        self.before_reply = before_reply
+        self.calls = []
+        self.options = {}
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def with_options(self, **options):
+        self.options = options
+        return self
+
+    def create(self, model, messages):
+        service = re.search(r"Service Name: (\S+)", messages[-1]["content"]).group(1)
+        with self.lock:
+            self.calls.append(service)
+            errors = self.failures.get(service)
+            error = errors.pop(0) if errors else None
+        if error is not None:
+            raise error
+        if self.before_reply:
+            self.before_reply(service)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"enriched {service}"))])
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = []
+
+    def acquire(self, estimated_tokens):
+        self.acquired.append(estimated_tokens)
+
+
+def make_rows(count):
+    return pd.DataFrame([{
+        "ID": i, "LONG_NAME": "Long", "SHORT_NAME": "Short", "DESCRIPTION": f"desc-{i}",
+        "SHORT_DESCRIPTION": "", "KEYWORDS": "", "CATEGORIES": "", "LIFE_EVENTS": "", "PROVIDER_NAMES": "",
+        "POPULARITY": 1, "COMBINED_NAME": f"service-{i}"
+    } for i in range(count)])
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(importer, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    return str(tmp_path / "enriched_services")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(importer, "monotonic", fake.monotonic)
+    monkeypatch.setattr(importer, "sleep", fake.sleep)
+    return fake
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = importer.TokenBucket(60)  # one unit per second
+    bucket.acquire(60)
+    assert clock.sleeps == []
+
+    bucket.acquire(3)
+    assert clock.sleeps == [pytest.approx(3.0)]
+
+
+def test_token_bucket_refill_is_capped(clock):
+    bucket = importer.TokenBucket(60)
+    clock.now += 3600
+    bucket.acquire(60)
+    bucket.acquire(1)
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_token_bucket_clamps_oversized_requests(clock):
+    bucket = importer.TokenBucket(60)
+    bucket.acquire(1000)
+    assert clock.sleeps == []
+    assert bucket.available == 0
+
+
+def test_retryable_errors_are_retried_through_the_limiter():
+    chat_client = FakeChatClient(failures={"service-0": [StatusError(429), StatusError(503)]})
+    limiter = CountingLimiter()
+
+    description = importer.enrich_description_with_gpt(make_rows(1).iloc[0], chat_client, limiter)
+
+    assert description == "desc-0 enriched service-0"
+    assert len(chat_client.calls) == 3
+    assert len(limiter.acquired) == 3
+
+
+def test_permanent_errors_are_not_retried():
+    chat_client = FakeChatClient(failures={"service-0": [StatusError(400)]})
+
+    with pytest.raises(StatusError):
+        importer.enrich_description_with_gpt(make_rows(1).iloc[0], chat_client)
+    assert len(chat_client.calls) == 1
+
+
+def test_retries_are_bounded():
+    chat_client = FakeChatClient(failures={"service-0": [StatusError(500)] * 10})
+
+    with pytest.raises(StatusError):
+        importer.enrich_description_with_gpt(make_rows(1).iloc[0], chat_client, max_retries=2)
+    assert len(chat_client.calls) == 3
+
+
+def test_enrich_and_save_writes_every_row(output_dir):
+    chat_client = FakeChatClient()
+    importer.enrich_and_save(make_rows(5), 0, output_dir, max_workers=3, chat_client=chat_client)
+
+    assert sorted(os.listdir(output_dir)) == [f"{i}.json" for i in range(5)]
+    with open(os.path.join(output_dir, "2.json"), encoding="utf-8") as f:
+        assert json.load(f)["ENRICHED_DESCRIPTION"] == "desc-2 enriched service-2"
+    assert st.session_state.last_processed_index == 5
+    assert chat_client.options == {"max_retries": 0}
+
+
+def test_out_of_order_completion_keeps_resume_index_contiguous(output_dir):
+    later_rows_done = threading.Event()
+
+    def before_reply(service):
+        if service == "service-0":
+            later_rows_done.wait(timeout=5)
+        elif service == "service-2":
+            later_rows_done.set()
+
+    chat_client = FakeChatClient(before_reply=before_reply)
+    importer.enrich_and_save(make_rows(3), 0, output_dir, max_workers=3, chat_client=chat_client)
+
+    assert later_rows_done.is_set()
+    assert st.session_state.last_processed_index == 3
+    assert len(os.listdir(output_dir)) == 3
+
+
+def test_permanent_failure_does_not_pin_resume_index(output_dir):
+    chat_client = FakeChatClient(failures={"service-1": [StatusError(400)]})
+    importer.enrich_and_save(make_rows(4), 0, output_dir, max_workers=2, chat_client=chat_client)
+
+    assert st.session_state.last_processed_index == 4
+    assert st.session_state.failed_ids == [1]
+    assert not os.path.exists(os.path.join(output_dir, "1.json"))
+
+
+def test_existing_files_are_skipped(output_dir):
+    importer.enrich_and_save(make_rows(2), 0, output_dir, max_workers=2, chat_client=FakeChatClient())
+
+    chat_client = FakeChatClient()
+    importer.enrich_and_save(make_rows(4), 0, output_dir, max_workers=2, chat_client=chat_client)
+
+    assert sorted(chat_client.calls) == ["service-2", "service-3"]
+    assert st.session_state.last_processed_index == 4
+
+
+def test_interrupted_write_leaves_no_output_file(output_dir, monkeypatch):
+    os.makedirs(output_dir)
+
+    def failing_dump(obj, f, **kwargs):
+        f.write('{"iD": ')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(importer.json, "dump", failing_dump)
+    with pytest.raises(OSError):
+        importer.enrich_and_write_row(make_rows(1).iloc[0], output_dir, FakeChatClient())
+
+    assert not os.path.exists(os.path.join(output_dir, "0.json"))
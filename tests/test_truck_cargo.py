@@ -0,0 +1,83 @@
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from geopy.distance import geodesic
+
+import truck_cargo
+
+
+def read_bytes(data, file_name="trucks.csv"):
+    return truck_cargo.read_table(hashlib.sha256(data).hexdigest(), file_name, data)
+
+
+def test_read_csv_casts_explicit_dtypes():
+    df = read_bytes(b"Address,Latitude,Longitude\nVilnius,54.6872,25.2797\nKaunas,54.8985,23.9036\n")
+
+    assert df['Latitude'].dtype == np.float32
+    assert df['Longitude'].dtype == np.float32
+    assert isinstance(df['Address'].dtype, pd.CategoricalDtype)
+    assert df['Address'].tolist() == ['Vilnius', 'Kaunas']
+
+
+def test_read_csv_missing_column():
+    with pytest.raises(ValueError, match="must contain columns"):
+        read_bytes(b"Address,Latitude\nVilnius,54.6872\n")
+
+
+def test_read_csv_non_numeric_coordinate():
+    with pytest.raises(ValueError):
+        read_bytes(b"Address,Latitude,Longitude\nVilnius,north,25.2797\n")
+
+
+def test_read_csv_empty_coordinate():
+    with pytest.raises(ValueError, match="1 row"):
+        read_bytes(b"Address,Latitude,Longitude\nVilnius,54.6872,25.2797\nKaunas,,23.9036\n")
+
+
+def test_read_csv_out_of_range_coordinate():
+    with pytest.raises(ValueError, match="first rows: 0"):
+        read_bytes(b"Address,Latitude,Longitude\nVilnius,95.0,25.2797\n")
+
+
+def test_read_parquet_resets_index():
+    frame = pd.DataFrame({'Address': ['Vilnius', 'Kaunas'], 'Latitude': [54.6872, 54.8985],
+                          'Longitude': [25.2797, 23.9036]}, index=['a', 'b'])
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer)
+
+    df = read_bytes(buffer.getvalue(), "trucks.parquet")
+    assert df.index.tolist() == [0, 1]
+    assert df['Latitude'].dtype == np.float32
+
+
+def test_read_feather():
+    frame = pd.DataFrame({'Address': ['Vilnius'], 'Latitude': [54.6872], 'Longitude': [25.2797]})
+    buffer = io.BytesIO()
+    frame.to_feather(buffer)
+
+    df = read_bytes(buffer.getvalue(), "cargo.arrow")
+    assert df['Address'].tolist() == ['Vilnius']
+
+
+def test_validate_coordinates_reports_bad_rows():
+    df = pd.DataFrame({'Latitude': [54.0, np.nan, 10.0, 0.0], 'Longitude': [25.0, 25.0, 181.0, 0.0]})
+    with pytest.raises(ValueError, match=r"2 row\(s\).*first rows: 1, 2"):
+        truck_cargo.validate_coordinates(df)
+
+
+def test_validate_coordinates_accepts_bounds():
+    df = pd.DataFrame({'Latitude': [90.0, -90.0], 'Longitude': [180.0, -180.0]})
+    truck_cargo.validate_coordinates(df)
+
+
+def test_calculate_distances_matches_geodesic():
+    trucks = pd.DataFrame({'Latitude': [54.6872, 54.8985], 'Longitude': [25.2797, 23.9036]}, index=[10, 20])
+    cargo = pd.DataFrame({'Latitude': [55.7033, 56.0, 54.0], 'Longitude': [21.1443, 24.0, 23.0]})
+
+    distances = truck_cargo.calculate_distances(trucks, cargo)
+    assert distances.shape == (2, 3)
+    expected = geodesic((54.8985, 23.9036), (55.7033, 21.1443)).kilometers
+    assert distances[1, 0] == pytest.approx(expected, rel=1e-5)
@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+import import_data_into_weaviate as importer
+
+
+class FakeBatch:
+    """Stand-in for the v3 client's batch: queues objects and replays canned responses on flush.
+
+    `flush_every` mimics auto-flushing from add_data_object, `failing_flushes` lists the
+    (1-based) flushes that raise instead of answering, and `fail_on_exit` makes the final
+    flush in __exit__ raise.
+    """
+
+    def __init__(self, failing_ids=(), flush_every=None, failing_flushes=(), fail_on_exit=False):
+        self.failing_ids = set(failing_ids)
+        self.flush_every = flush_every
+        self.failing_flushes = set(failing_flushes)
+        self.fail_on_exit = fail_on_exit
+        self.flushes = 0
+        self.config = {}
+        self.objects = []
+        self.pending = []
+
+    def configure(self, **kwargs):
+        self.config = kwargs
+
+    def add_data_object(self, data_object, class_name, uuid=None, vector=None):
+        obj = {"data_object": data_object, "class_name": class_name, "uuid": uuid, "vector": vector}
+        self.objects.append(obj)
+        self.pending.append(obj)
+        if self.flush_every and len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self.flushes += 1
+        sent, self.pending = self.pending, []
+        if self.flushes in self.failing_flushes:
+            raise ConnectionError("Batch was not added to weaviate.")
+        results = []
+        for obj in sent:
+            result = {"id": obj["uuid"], "result": {}}
+            if obj["data_object"]["iD"] in self.failing_ids:
+                result["result"]["errors"] = {"error": [{"message": "invalid object"}]}
+            results.append(result)
+        self.config["callback"](results)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.fail_on_exit:
+            raise ConnectionError("Final flush failed.")
+        if self.pending:
+            self.flush()
+        return False
+
+
+class FakeSchema:
+    def __init__(self):
+        self.classes = []
+
+    def exists(self, class_name):
+        return any(schema["class"] == class_name for schema in self.classes)
+
+    def create_class(self, schema):
+        self.classes.append(schema)
+
+
+class FakeWeaviateClient:
+    def __init__(self, failing_ids=(), **batch_options):
+        self.schema = FakeSchema()
+        self.batch = FakeBatch(failing_ids, **batch_options)
+
+
+def write_services(directory, ids):
+    for service_id in ids:
+        data_object = {"iD": service_id, "COMBINED_NAME": f"Service {service_id}",
+                       "ENRICHED_DESCRIPTION": f"Description of service {service_id}"}
+        with open(directory / f"{service_id}.json", "w", encoding="utf-8") as f:
+            json.dump(data_object, f)
+
+
+def run_upload(input_dir, db_client, cache_path):
+    return importer.upload_to_weaviate(
+        str(input_dir),
+        db_client=db_client,
+        embedder=importer.HashingEmbedder(dimensions=16),
+        vector_cache=importer.VectorCache(str(cache_path))
+    )
+
+
+@pytest.fixture
+def services_dir(tmp_path):
+    directory = tmp_path / "enriched_services"
+    directory.mkdir()
+    write_services(directory, ["1", "2", "3"])
+    return directory
+
+
+def test_uuids_are_stable_across_runs(services_dir, tmp_path):
+    first, second = FakeWeaviateClient(), FakeWeaviateClient()
+    run_upload(services_dir, first, tmp_path / "cache.sqlite3")
+    run_upload(services_dir, second, tmp_path / "cache.sqlite3")
+
+    first_uuids = [obj["uuid"] for obj in first.batch.objects]
+    second_uuids = [obj["uuid"] for obj in second.batch.objects]
+    assert first_uuids == second_uuids
+    assert len(set(first_uuids)) == 3
+    assert first_uuids[0] == importer.service_uuid("1")
+
+
+def test_schema_created_and_batch_configured(services_dir, tmp_path):
+    db_client = FakeWeaviateClient()
+    run_upload(services_dir, db_client, tmp_path / "cache.sqlite3")
+
+    assert [schema["class"] for schema in db_client.schema.classes] == [importer.SERVICE_CLASS_NAME]
+    assert db_client.batch.config["dynamic"] is True
+    assert db_client.batch.config["num_workers"] == importer.DEFAULT_BATCH_WORKERS
+
+
+def test_collect_batch_errors_reads_object_errors():
+    errors = []
+    importer.collect_batch_errors([
+        {"id": "a", "result": {}},
+        {"id": "b", "result": {"errors": {"error": [{"message": "first"}, {"message": "second"}]}}},
+        {"id": "c"},
+    ], errors)
+    assert errors == [("b", "first; second")]
+
+
+def test_upload_counts_exclude_failed_objects(services_dir, tmp_path):
+    db_client = FakeWeaviateClient(failing_ids=["2"])
+    uploaded, batch_errors = run_upload(services_dir, db_client, tmp_path / "cache.sqlite3")
+
+    assert uploaded == 2
+    assert batch_errors == [(importer.service_uuid("2"), "invalid object")]
+
+
+def test_failed_auto_flush_counts_lost_objects(services_dir, tmp_path):
+    db_client = FakeWeaviateClient(flush_every=2, failing_flushes=[1])
+    uploaded, batch_errors = run_upload(services_dir, db_client, tmp_path / "cache.sqlite3")
+
+    assert uploaded == 1
+    assert batch_errors == [(importer.service_uuid("1"), "Batch was not added to weaviate."),
+                            (importer.service_uuid("2"), "Batch was not added to weaviate.")]
+
+
+def test_failed_final_flush_is_reported_not_raised(services_dir, tmp_path):
+    db_client = FakeWeaviateClient(fail_on_exit=True)
+    uploaded, batch_errors = run_upload(services_dir, db_client, tmp_path / "cache.sqlite3")
+
+    assert uploaded == 0
+    assert [object_uuid for object_uuid, _ in batch_errors] == [importer.service_uuid(i) for i in "123"]
+    assert {message for _, message in batch_errors} == {"Final flush failed."}
+
+
+def test_upload_skips_unreadable_files(services_dir, tmp_path):
+    (services_dir / "broken.json").write_text("{not json", encoding="utf-8")
+    db_client = FakeWeaviateClient()
+    uploaded, batch_errors = run_upload(services_dir, db_client, tmp_path / "cache.sqlite3")
+
+    assert uploaded == 3
+    assert batch_errors == []
+
+
+def test_upload_with_no_files(tmp_path):
+    empty_dir = tmp_path / "empty"
+    empty_dir.mkdir()
+    assert run_upload(empty_dir, FakeWeaviateClient(), tmp_path / "cache.sqlite3") == (0, [])
@@ -6,45 +6,103 @@ import folium
 from streamlit_folium import folium_static
 from geopy.distance import geodesic
 import json
+import hashlib
+import io
+
+
+REQUIRED_COLUMNS = ['Address', 'Latitude', 'Longitude']
+COLUMN_DTYPES = {'Address': 'category', 'Latitude': 'float32', 'Longitude': 'float32'}
+SUPPORTED_FILE_TYPES = ['csv', 'parquet', 'arrow', 'feather']
+
+
+def file_content_hash(uploaded_file):
+    """
+    Return a SHA-256 hex digest of the uploaded file contents
+    """
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+
+def validate_coordinates(df):
+    """
+    Vectorized check that every row has a finite latitude/longitude in range
+    """
+    lat = df['Latitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+    lon = df['Longitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (np.isfinite(lat) & np.isfinite(lon)
+             & (np.abs(lat) <= 90) & (np.abs(lon) <= 180))
+    if not valid.all():
+        bad_rows = np.flatnonzero(~valid)
+        preview = ', '.join(str(i) for i in bad_rows[:5])
+        raise ValueError(f"{len(bad_rows)} row(s) have missing or out-of-range coordinates "
+                         f"(first rows: {preview})")
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def read_table(content_hash, file_name, _file_bytes):
+    """
+    Parse CSV/Parquet/Arrow bytes into a typed DataFrame, cached by content hash
+    """
+    extension = file_name.rsplit('.', 1)[-1].lower()
+    buffer = io.BytesIO(_file_bytes)
+    if extension == 'parquet':
+        df = pd.read_parquet(buffer)
+    elif extension in ('arrow', 'feather'):
+        df = pd.read_feather(buffer)
+    else:
+        df = pd.read_csv(buffer, dtype=COLUMN_DTYPES)
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"File must contain columns: {', '.join(REQUIRED_COLUMNS)}")
+
+    df = df.astype(COLUMN_DTYPES).reset_index(drop=True)
+    validate_coordinates(df)
+    return df
 
 
 def load_data(uploaded_file):
     """
-    Load and validate CSV file
+    Load and validate a CSV, Parquet or Arrow file
+    Returns (DataFrame, content hash), or (None, None) if nothing could be loaded
     """
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
-            required_columns = ['Address', 'Latitude', 'Longitude']
-            if not all(col in df.columns for col in required_columns):
-                st.error(f"File must contain columns: {', '.join(required_columns)}")
-                return None
-            return df
+            content_hash = file_content_hash(uploaded_file)
+            return read_table(content_hash, uploaded_file.name, uploaded_file.getvalue()), content_hash
         except Exception as e:
             st.error(f"Error loading file: {str(e)}")
-            return None
-    return None
+            return None, None
+    return None, None
 
 
 def calculate_distances(trucks_df, cargo_df):
     """
     Calculate distance matrix between all trucks and cargo locations
     """
-    distances = np.zeros((len(trucks_df), len(cargo_df)))
-    for i, truck in trucks_df.iterrows():
-        for j, cargo in cargo_df.iterrows():
-            truck_loc = (truck['Latitude'], truck['Longitude'])
-            cargo_loc = (cargo['Latitude'], cargo['Longitude'])
+    truck_coords = trucks_df[['Latitude', 'Longitude']].to_numpy(dtype=np.float64)
+    cargo_coords = cargo_df[['Latitude', 'Longitude']].to_numpy(dtype=np.float64)
+    distances = np.zeros((len(truck_coords), len(cargo_coords)), dtype=np.float32)
+    for i, truck_loc in enumerate(truck_coords):
+        for j, cargo_loc in enumerate(cargo_coords):
             distances[i, j] = geodesic(truck_loc, cargo_loc).kilometers
     return distances
 
 
-def optimize_assignments(trucks_df, cargo_df):
+@st.cache_data(show_spinner="Calculating distances...", max_entries=4)
+def cached_distances(trucks_hash, cargo_hash, _trucks_df, _cargo_df):
+    """
+    Distance matrix cached by the content hashes of the two uploaded files
+    """
+    return calculate_distances(_trucks_df, _cargo_df)
+
+
+def optimize_assignments(trucks_df, cargo_df, distances=None):
     """
     Optimize assignments between trucks and cargo
     Returns list of (truck_idx, cargo_idx) tuples
     """
-    distances = calculate_distances(trucks_df, cargo_df)
+    if distances is None:
+        distances = calculate_distances(trucks_df, cargo_df)
     num_trucks = len(trucks_df)
     num_cargo = len(cargo_df)
 
@@ -65,7 +123,7 @@ def optimize_assignments(trucks_df, cargo_df):
     return valid_assignments
 
 
-def create_map(trucks_df, cargo_df, assignments):
+def create_map(trucks_df, cargo_df, assignments, distances=None):
     """
     Create a Folium map with trucks, cargo markers and connection lines
     """
@@ -107,15 +165,18 @@ def create_map(trucks_df, cargo_df, assignments):
         ).add_to(m)
 
         # Calculate distance
-        distance = geodesic(
-            (truck['Latitude'], truck['Longitude']),
-            (cargo['Latitude'], cargo['Longitude'])
-        ).kilometers
+        if distances is not None:
+            distance = distances[truck_idx, cargo_idx]
+        else:
+            distance = geodesic(
+                (truck['Latitude'], truck['Longitude']),
+                (cargo['Latitude'], cargo['Longitude'])
+            ).kilometers
 
         # Create line with distance tooltip
         points = [
-            [truck['Latitude'], truck['Longitude']],
-            [cargo['Latitude'], cargo['Longitude']]
+            [float(truck['Latitude']), float(truck['Longitude'])],
+            [float(cargo['Latitude']), float(cargo['Longitude'])]
         ]
 
         # Add line with hover effect
@@ -179,21 +240,21 @@ def main():
 
         st.subheader("Trucks Data")
         trucks_file = st.file_uploader(
-            "Upload CSV file with truck positions",
-            type=['csv'],
+            "Upload CSV, Parquet or Arrow file with truck positions",
+            type=SUPPORTED_FILE_TYPES,
             key='trucks'
         )
 
         st.subheader("Cargo Data")
         cargo_file = st.file_uploader(
-            "Upload CSV file with cargo positions",
-            type=['csv'],
+            "Upload CSV, Parquet or Arrow file with cargo positions",
+            type=SUPPORTED_FILE_TYPES,
             key='cargo'
         )
 
     # Load data when files are uploaded
-    trucks_df = load_data(trucks_file)
-    cargo_df = load_data(cargo_file)
+    trucks_df, trucks_hash = load_data(trucks_file)
+    cargo_df, cargo_hash = load_data(cargo_file)
 
     if trucks_df is not None and cargo_df is not None:
         # Show warning if unequal numbers
@@ -203,17 +264,12 @@ def main():
 
         try:
             # Calculate optimized assignments
-            assignments = optimize_assignments(trucks_df, cargo_df)
+            distances = cached_distances(trucks_hash, cargo_hash, trucks_df, cargo_df)
+            assignments = optimize_assignments(trucks_df, cargo_df, distances)
 
             if assignments:
                 # Calculate total distance for valid assignments
-                total_distance = sum(
-                    geodesic(
-                        (trucks_df.iloc[r]['Latitude'], trucks_df.iloc[r]['Longitude']),
-                        (cargo_df.iloc[c]['Latitude'], cargo_df.iloc[c]['Longitude'])
-                    ).kilometers
-                    for r, c in assignments
-                )
+                total_distance = float(sum(distances[r, c] for r, c in assignments))
 
                 # Display optimization results
                 st.subheader("Optimization Results")
@@ -224,10 +280,7 @@ def main():
                 for truck_idx, cargo_idx in assignments:
                     truck = trucks_df.iloc[truck_idx]
                     cargo = cargo_df.iloc[cargo_idx]
-                    distance = geodesic(
-                        (truck['Latitude'], truck['Longitude']),
-                        (cargo['Latitude'], cargo['Longitude'])
-                    ).kilometers
+                    distance = distances[truck_idx, cargo_idx]
 
                     assignments_data.append({
                         "Truck Location": truck['Address'],
@@ -239,7 +292,7 @@ def main():
 
                 # Display map
                 st.subheader("Map Visualization")
-                map_obj = create_map(trucks_df, cargo_df, assignments)
+                map_obj = create_map(trucks_df, cargo_df, assignments, distances)
                 folium_static(map_obj)
 
                 # Display summary statistics